@@ -8,5 +8,14 @@ class Config:
         self.config = configparser.RawConfigParser()
         self.config.read(CONFIG_FILE)
 
-    def get(self, section, option):
-        return self.config.get(section, option)
+    def get(self, section, option, **kwargs):
+        return self.config.get(section, option, **kwargs)
+
+    def getboolean(self, section, option, **kwargs):
+        return self.config.getboolean(section, option, **kwargs)
+
+    def getfloat(self, section, option, **kwargs):
+        return self.config.getfloat(section, option, **kwargs)
+
+    def getint(self, section, option, **kwargs):
+        return self.config.getint(section, option, **kwargs)
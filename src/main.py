@@ -1,11 +1,23 @@
 import time
+import signal
 import logging
 from logger import setup_logging
+from tracer import setup_tracing, tracer
 from scheduler_robot import SchedulerRobot
 from config import Config
 
 config = Config()
 
+
+def handle_sigterm(signum, frame):
+    """
+    Turn SIGTERM into a KeyboardInterrupt so the trace is exported the same way as on Ctrl+C.
+    Further SIGTERMs are ignored so they cannot interrupt the shutdown.
+    """
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    raise KeyboardInterrupt
+
+
 if __name__ == '__main__':
     setup_logging(
         config.get('LOGGING', 'LOG_LEVEL'),
@@ -13,6 +25,18 @@ if __name__ == '__main__':
         config.get('LOGGING', 'LOG_FILE'),
         config.get('LOGGING', 'LOG_MODE')
     )
+    trace_enabled = config.getboolean('PROFILING', 'TRACE_ENABLED', fallback=False)
+    sampling_enabled = config.getboolean('PROFILING', 'SAMPLING_ENABLED', fallback=False)
+    setup_tracing(
+        trace_enabled,
+        config.get('PROFILING', 'TRACE_FILE', fallback='../trace.json'),
+        sampling_enabled,
+        config.getfloat('PROFILING', 'SAMPLING_INTERVAL', fallback=0.1),
+        config.getfloat('PROFILING', 'FLUSH_INTERVAL', fallback=60.0),
+        config.getint('PROFILING', 'MAX_EVENTS', fallback=100000)
+    )
+    if trace_enabled or sampling_enabled:
+        signal.signal(signal.SIGTERM, handle_sigterm)
     scheduler = SchedulerRobot(
         config.get('GENERAL', 'INPUT_PATH'),
         config.get('GENERAL', 'UR_SETUP_FILE'),
@@ -28,4 +52,5 @@ if __name__ == '__main__':
     finally:
         scheduler.stop()
         time.sleep(1)
+        tracer.stop()
         logging.info("Main loop stopped.")
@@ -1,8 +1,14 @@
+import itertools
 from fleet_manager import FleetManager
 from file_loader import load_json_file
+from tracer import tracer
 import logging
 
 
+# Unique identifier of each Path instance, shared by every trace event of its plate journey
+journey_ids = itertools.count(1)
+
+
 class Path:
     def __init__(self, name, start_position, end_position, action, plate_number, handler, robots_dict,
                  task_queue=None):
@@ -16,6 +22,9 @@ class Path:
         self.robots_dict = robots_dict
         self.task_queue = task_queue or self.initialize_task_queue()
         self.stop_thread = False
+        self.journey_id = next(journey_ids)
+        self.flow_started = False
+        self.trace_args = {"path": self.name, "plate": self.plate_number, "journey": self.journey_id}
 
     @classmethod
     def from_config(cls, config_file, handler, universal_robots, task_queue):
@@ -39,21 +48,28 @@ class Path:
         Execute tasks in the task queue one by one. If the task queue is empty, remove this path from the handler.
         """
 
-        while self.task_queue and not self.stop_thread:
-            robot, task, state = self.task_queue[0]
-            if state == "NotDone":
-                # Wait for the robot to be connected before sending the task
-                if robot.name[:2] == "UR":
-                    robot.wait_for_connection()
-                robot.send_task(task)
-                self.task_queue[0] = (robot, task, "IsDoing")
-                self.handler.save_state()
-            elif state == "IsDoing":
-                if robot.name[:2] == "UR":
-                    robot.wait_for_connection()
-                robot.wait_task_end()
-                self.task_queue.pop(0)
-                self.handler.save_state()
+        with tracer.span("Path.execute_tasks", **self.trace_args):
+            if self.flow_started:
+                tracer.flow("journey", self.journey_id, start=False)
+            while self.task_queue and not self.stop_thread:
+                robot, task, state = self.task_queue[0]
+                if state == "NotDone":
+                    # Wait for the robot to be connected before sending the task
+                    if robot.name[:2] == "UR":
+                        with tracer.span("wait_for_connection", robot=robot.name, **self.trace_args):
+                            robot.wait_for_connection()
+                    with tracer.span("send_task", robot=robot.name, task=task, **self.trace_args):
+                        robot.send_task(task)
+                    self.task_queue[0] = (robot, task, "IsDoing")
+                    self.handler.save_state(self)
+                elif state == "IsDoing":
+                    if robot.name[:2] == "UR":
+                        with tracer.span("wait_for_connection", robot=robot.name, **self.trace_args):
+                            robot.wait_for_connection()
+                    with tracer.span("wait_task_end", robot=robot.name, task=task, **self.trace_args):
+                        robot.wait_task_end()
+                    self.task_queue.pop(0)
+                    self.handler.save_state(self)
         if not self.task_queue:
             self.handler.remove_path(self)
             logging.info(f"Stopped tasks for path {self.name}")
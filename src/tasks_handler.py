@@ -6,6 +6,7 @@ from watchdog.events import PatternMatchingEventHandler
 from path import Path
 from universal_robots import UniversalRobots
 from fleet_manager import FleetManager
+from tracer import tracer
 
 
 class TasksHandler(PatternMatchingEventHandler):
@@ -53,18 +54,25 @@ class TasksHandler(PatternMatchingEventHandler):
             task_queue.append((robot, task, state))
         return task_queue
 
-    def create_and_start_path(self, path_data, task_queue):
+    def create_and_start_path(self, path_data, task_queue, start_flow=False):
         path = Path(path_data, self, self.universal_robots, task_queue)
         self.path_list.append(path)
-        threading.Thread(target=path.execute_tasks).start()
+        if start_flow:
+            # Link the caller's span to the path's execution running on the new thread
+            tracer.flow("journey", path.journey_id, start=True)
+            path.flow_started = True
+        threading.Thread(target=path.execute_tasks, name=f"Path-{path.name}-{path.journey_id}").start()
+        return path
 
     def on_created(self, event):
         """
         Called when a new file is created.
         """
-        with open(event.src_path, 'r') as input_file:
-            path_data = load_json_file(input_file)
-            self.create_and_start_path(path_data, None)
+        with tracer.span("TasksHandler.on_created", file=event.src_path) as trace_args:
+            with open(event.src_path, 'r') as input_file:
+                path_data = load_json_file(input_file)
+                path = self.create_and_start_path(path_data, None, start_flow=True)
+                trace_args.update(path.trace_args)
 
     def remove_path(self, path):
         """
@@ -72,13 +80,16 @@ class TasksHandler(PatternMatchingEventHandler):
         """
         self.path_list.remove(path)
 
-    def save_state(self):
+    def save_state(self, triggering_path=None):
         """
         Save the current state to a file.
+        The path triggering the save, if any, is only used to attribute the time spent to its plate in the trace.
         """
-        with open(self.state_file, 'w') as file:
-            paths_to_save = [path for path in self.path_list if path.task_queue]
-            json.dump([path.to_dict() for path in paths_to_save], file, indent=4)
+        trace_args = triggering_path.trace_args if triggering_path else {}
+        with tracer.span("TasksHandler.save_state", category="io", **trace_args):
+            with open(self.state_file, 'w') as file:
+                paths_to_save = [path for path in self.path_list if path.task_queue]
+                json.dump([path.to_dict() for path in paths_to_save], file, indent=4)
 
     def stop_tasks(self):
         """
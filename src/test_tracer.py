@@ -0,0 +1,204 @@
+import json
+import os
+import threading
+import time
+from tracer import Tracer
+
+
+def load_trace(trace_file):
+    with open(trace_file, 'r') as file:
+        return json.load(file)
+
+
+def events_of_phase(trace, phase):
+    return [event for event in trace["traceEvents"] if event["ph"] == phase]
+
+
+def first_function():
+    pass
+
+
+def second_function():
+    pass
+
+
+def third_function():
+    pass
+
+
+def test_disabled_tracer_records_nothing(tmp_path):
+    trace_file = tmp_path / "t.json"
+    tracer = Tracer(enabled=False, trace_file=str(trace_file))
+
+    with tracer.span("ignored", plate=1) as args:
+        assert args == {}
+    tracer.flow("journey", 1, start=True)
+    tracer.export()
+
+    assert not tracer.events
+    assert not trace_file.exists()
+
+
+def test_span_is_exported_as_complete_event(tmp_path):
+    trace_file = tmp_path / "t.json"
+    tracer = Tracer(enabled=True, trace_file=str(trace_file))
+
+    with tracer.span("send_task", robot="UR_SFC") as args:
+        args.update(plate=3)
+    tracer.export()
+
+    spans = events_of_phase(load_trace(trace_file), "X")
+    assert len(spans) == 1
+    assert spans[0]["name"] == "send_task"
+    assert spans[0]["dur"] >= 0
+    assert spans[0]["tid"] == threading.get_ident()
+    assert spans[0]["args"] == {"robot": "UR_SFC", "plate": "3"}
+
+
+def test_open_span_is_exported_as_unfinished(tmp_path):
+    trace_file = tmp_path / "t.json"
+    tracer = Tracer(enabled=True, trace_file=str(trace_file))
+
+    with tracer.span("wait_task_end"):
+        tracer.export()
+        spans = events_of_phase(load_trace(trace_file), "X")
+        assert [span["args"] for span in spans] == [{"unfinished": "true"}]
+
+    tracer.export()
+    spans = events_of_phase(load_trace(trace_file), "X")
+    assert [span["args"] for span in spans] == [{}]
+    assert not tracer.open_spans
+
+
+def test_ring_buffer_keeps_the_most_recent_events(tmp_path):
+    trace_file = tmp_path / "t.json"
+    max_events = 5
+    tracer = Tracer(enabled=True, trace_file=str(trace_file), max_events=max_events)
+
+    for number in range(3 * max_events):
+        with tracer.span("save_state", number=number):
+            pass
+    tracer.export()
+
+    trace = load_trace(trace_file)
+    spans = events_of_phase(trace, "X")
+    assert len(trace["traceEvents"]) - len(events_of_phase(trace, "M")) <= max_events
+    assert [span["args"]["number"] for span in spans] == [str(number) for number in range(10, 15)]
+
+
+def test_set_max_events_keeps_the_most_recent_events():
+    tracer = Tracer(enabled=True, max_events=10)
+
+    for number in range(10):
+        with tracer.span("save_state", number=number):
+            pass
+    tracer.set_max_events(2)
+
+    assert [event["args"]["number"] for event in tracer.events] == ["8", "9"]
+
+
+def test_flow_links_spans_across_threads(tmp_path):
+    trace_file = tmp_path / "t.json"
+    tracer = Tracer(enabled=True, trace_file=str(trace_file))
+
+    def execute():
+        with tracer.span("Path.execute_tasks"):
+            tracer.flow("journey", 7, start=False)
+
+    with tracer.span("TasksHandler.on_created"):
+        tracer.flow("journey", 7, start=True)
+        thread = threading.Thread(target=execute, name="Path-test-7")
+        thread.start()
+        thread.join()
+    tracer.export()
+
+    trace = load_trace(trace_file)
+    flow_start, = events_of_phase(trace, "s")
+    flow_end, = events_of_phase(trace, "f")
+    assert flow_start["id"] == flow_end["id"] == "7"
+    assert flow_start["tid"] != flow_end["tid"]
+    assert flow_end["bp"] == "e"
+    assert "bp" not in flow_start
+
+
+def test_thread_names_are_exported_as_metadata(tmp_path):
+    trace_file = tmp_path / "t.json"
+    tracer = Tracer(enabled=True, trace_file=str(trace_file))
+
+    def execute():
+        with tracer.span("Path.execute_tasks"):
+            pass
+
+    thread = threading.Thread(target=execute, name="Path-test-1")
+    thread.start()
+    thread.join()
+    tracer.export()
+
+    metadata = events_of_phase(load_trace(trace_file), "M")
+    assert [(event["name"], event["args"]["name"]) for event in metadata] == [("thread_name", "Path-test-1")]
+
+
+def test_intern_stack_chains_parents(tmp_path):
+    trace_file = tmp_path / "t.json"
+    tracer = Tracer(enabled=True, trace_file=str(trace_file))
+
+    with tracer.lock:
+        first_leaf = tracer.intern_stack([first_function.__code__, second_function.__code__])
+        second_leaf = tracer.intern_stack([first_function.__code__, third_function.__code__])
+        repeated_leaf = tracer.intern_stack([first_function.__code__, second_function.__code__])
+    with tracer.span("sampled"):
+        pass
+    tracer.export()
+
+    stack_frames = load_trace(trace_file)["stackFrames"]
+    assert repeated_leaf == first_leaf
+    assert len(stack_frames) == 3
+    root = stack_frames[first_leaf]["parent"]
+    assert stack_frames[second_leaf]["parent"] == root
+    assert "parent" not in stack_frames[root]
+    assert stack_frames[root]["name"] == "first_function (test_tracer.py)"
+    assert stack_frames[first_leaf]["name"] == "second_function (test_tracer.py)"
+
+
+def test_sampler_records_other_threads(tmp_path):
+    trace_file = tmp_path / "t.json"
+    tracer = Tracer(trace_file=str(trace_file), sampling_interval=0.01)
+    stop = threading.Event()
+    thread = threading.Thread(target=stop.wait, name="Sampled")
+    thread.start()
+
+    tracer.start_sampling()
+    time.sleep(0.1)
+    tracer.stop()
+    stop.set()
+    thread.join()
+
+    trace = load_trace(trace_file)
+    assert trace["samples"]
+    assert all(sample["sf"] in trace["stackFrames"] for sample in trace["samples"])
+    assert {sample["tid"] for sample in trace["samples"]} >= {thread.ident}
+    assert "Sampled" in [event["args"]["name"] for event in events_of_phase(trace, "M")]
+    assert tracer.sampler_thread is None
+
+
+def test_export_replaces_the_trace_file_atomically(tmp_path):
+    trace_file = tmp_path / "t.json"
+    trace_file.write_text("previous trace")
+    tracer = Tracer(enabled=True, trace_file=str(trace_file))
+
+    with tracer.span("save_state"):
+        pass
+    tracer.export()
+
+    assert len(events_of_phase(load_trace(trace_file), "X")) == 1
+    assert os.listdir(tmp_path) == ["t.json"]
+
+
+def test_export_failure_is_logged(tmp_path, caplog):
+    tracer = Tracer(enabled=True, trace_file=str(tmp_path / "missing" / "t.json"))
+
+    with tracer.span("save_state"):
+        pass
+    tracer.export()
+
+    assert "An error occurred while exporting the trace" in caplog.text
@@ -0,0 +1,322 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import itertools
+from collections import deque
+from contextlib import contextmanager
+
+
+class Tracer:
+    """
+    Collects timing spans and stack samples and exports them as Chrome trace JSON.
+
+    Only the Chrome Trace Event Format is produced; the file can be opened in chrome://tracing or Perfetto.
+    Spans are recorded as complete ("X") events; spans still open at export time are written too, ending at the
+    export and marked with an "unfinished" argument. Plate journeys are linked across threads with flow ("s"/"f")
+    events and stack samples go into the "stackFrames"/"samples" sections of the same file.
+
+    Attributes:
+        enabled (bool): Whether spans are recorded. When False, span() costs a single attribute check.
+        trace_file (str): The file the trace is written to on export.
+        sampling_interval (float): Seconds between two stack samples of the sampling profiler.
+        flush_interval (float): Seconds between two periodic exports of the trace file.
+        events (deque): The most recent spans, older ones are dropped once max_events is reached.
+        samples (deque): The most recent stack samples, bounded the same way.
+        open_spans (dict): Spans whose with block has not exited yet, keyed by a unique span number.
+        thread_names (dict): Name of every thread seen in the spans and samples, keyed by thread id.
+    """
+
+    def __init__(self, enabled=False, trace_file=None, sampling_interval=0.1, flush_interval=60.0,
+                 max_events=100000):
+        self.enabled = enabled
+        self.trace_file = trace_file
+        self.sampling_interval = sampling_interval
+        self.flush_interval = flush_interval
+        self.pid = os.getpid()
+        self.events = deque(maxlen=max_events)
+        self.stack_frames = {}
+        self.samples = deque(maxlen=max_events)
+        self.open_spans = {}
+        self.span_numbers = itertools.count()
+        self.thread_names = {}
+        self.lock = threading.Lock()
+        self.sampler_thread = None
+        self.stop_sampling = threading.Event()
+        self.flusher_thread = None
+        self.stop_flushing = threading.Event()
+
+    def set_max_events(self, max_events):
+        """
+        Resize the span and sample ring buffers, keeping the most recent entries.
+        """
+
+        with self.lock:
+            self.events = deque(self.events, maxlen=max_events)
+            self.samples = deque(self.samples, maxlen=max_events)
+
+    @staticmethod
+    def now():
+        """
+        Current time in microseconds, the unit used by the Trace Event Format.
+        """
+
+        return time.perf_counter_ns() // 1000
+
+    @contextmanager
+    def span(self, name, category="scheduler", **args):
+        """
+        Record the time spent inside the with block as a complete event.
+        The args dictionary is yielded so arguments only known inside the block can still be added to the span.
+        Until the block exits, the span is kept in open_spans so an export can still write it.
+        """
+
+        if not self.enabled:
+            yield {}
+            return
+        span_number = next(self.span_numbers)
+        span = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": self.now(),
+            "pid": self.pid,
+            "tid": threading.get_ident(),
+            "args": args
+        }
+        with self.lock:
+            self.thread_names[span["tid"]] = threading.current_thread().name
+            self.open_spans[span_number] = span
+        try:
+            yield args
+        finally:
+            end = self.now()
+            with self.lock:
+                del self.open_spans[span_number]
+                self.events.append(self.complete_span(span, end))
+
+    @staticmethod
+    def complete_span(span, end, unfinished=False):
+        """
+        Build the complete event of a span ending at the given time.
+        """
+
+        args = {key: str(value) for key, value in list(span["args"].items())}
+        if unfinished:
+            args["unfinished"] = "true"
+        return dict(span, dur=end - span["ts"], args=args)
+
+    def flow(self, name, flow_id, start, category="scheduler"):
+        """
+        Record one end of a flow event linking the enclosing spans of two threads.
+
+        The start of the flow binds to the span around it on the emitting thread and the end binds to the span
+        around it on the receiving thread, so a plate journey can be followed across threads.
+        """
+
+        if not self.enabled:
+            return
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "s" if start else "f",
+            "id": str(flow_id),
+            "ts": self.now(),
+            "pid": self.pid,
+            "tid": threading.get_ident()
+        }
+        if not start:
+            event["bp"] = "e"
+        with self.lock:
+            self.thread_names[event["tid"]] = threading.current_thread().name
+            self.events.append(event)
+
+    def start_sampling(self):
+        """
+        Start the sampling profiler in a daemon thread.
+        """
+
+        if self.sampler_thread is not None:
+            return
+        logging.info(f"Starting sampling profiler with an interval of {self.sampling_interval}s.")
+        self.stop_sampling.clear()
+        self.sampler_thread = threading.Thread(target=self.sample_stacks, name="TraceSampler", daemon=True)
+        self.sampler_thread.start()
+
+    def stop_sampler(self):
+        """
+        Stop the sampling profiler and wait for its thread to end.
+        """
+
+        if self.sampler_thread is None:
+            return
+        self.stop_sampling.set()
+        self.sampler_thread.join()
+        self.sampler_thread = None
+        logging.info("Sampling profiler stopped.")
+
+    def start_flushing(self):
+        """
+        Start a daemon thread exporting the trace file every flush_interval seconds, so a killed or crashed
+        process still leaves its most recent trace on disk.
+        """
+
+        if self.flusher_thread is not None:
+            return
+        self.stop_flushing.clear()
+        self.flusher_thread = threading.Thread(target=self.flush_periodically, name="TraceFlusher", daemon=True)
+        self.flusher_thread.start()
+
+    def stop_flusher(self):
+        """
+        Stop the periodic export and wait for its thread to end.
+        """
+
+        if self.flusher_thread is None:
+            return
+        self.stop_flushing.set()
+        self.flusher_thread.join()
+        self.flusher_thread = None
+
+    def flush_periodically(self):
+        """
+        Export the trace file until the flusher is stopped.
+        """
+
+        while not self.stop_flushing.wait(self.flush_interval):
+            self.export()
+
+    def sample_stacks(self):
+        """
+        Periodically record the current stack of every thread except the sampler itself.
+
+        Frames are keyed by their code object only, without line numbers, so the stack frame table stays bounded
+        by the amount of code rather than by the number of lines executed. The lock is taken once per round.
+        """
+
+        own_id = threading.get_ident()
+        while not self.stop_sampling.wait(self.sampling_interval):
+            timestamp = self.now()
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stacks.append((thread_id, stack))
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            with self.lock:
+                for thread_id, stack in stacks:
+                    self.thread_names[thread_id] = names.get(thread_id, str(thread_id))
+                    self.samples.append({
+                        "cpu": 0,
+                        "tid": thread_id,
+                        "ts": timestamp,
+                        "name": "sample",
+                        "sf": self.intern_stack(reversed(stack)),
+                        "weight": 1
+                    })
+
+    def intern_stack(self, stack):
+        """
+        Register a root-first stack of code objects in the stack frame table and return the id of its leaf frame.
+        Must be called with the lock held.
+        """
+
+        parent = None
+        for code in stack:
+            key = (parent, code.co_filename, code.co_name)
+            frame_id = self.stack_frames.get(key)
+            if frame_id is None:
+                frame_id = str(len(self.stack_frames) + 1)
+                self.stack_frames[key] = frame_id
+            parent = frame_id
+        return parent
+
+    def export(self):
+        """
+        Write all buffered spans and samples, and the spans still open, to the trace file.
+
+        The file is written to a temporary file first and then moved in place, so a reader or a crash never
+        sees a partially written trace.
+        """
+
+        if not self.trace_file or not (self.events or self.samples or self.open_spans):
+            return
+        end = self.now()
+        with self.lock:
+            stack_frames = {}
+            for (parent, file_name, name), frame_id in self.stack_frames.items():
+                stack_frames[frame_id] = {"name": f"{name} ({os.path.basename(file_name)})", "category": "python"}
+                if parent is not None:
+                    stack_frames[frame_id]["parent"] = parent
+            events = list(self.events) + [self.complete_span(span, end, unfinished=True)
+                                          for span in self.open_spans.values()]
+            samples = list(self.samples)
+            # Only keep the names of threads still present in the buffers, so the table does not grow with every
+            # path thread started during a long run
+            thread_ids = {event["tid"] for event in events} | {sample["tid"] for sample in samples}
+            self.thread_names = {thread_id: self.thread_names[thread_id] for thread_id in thread_ids}
+            events.extend({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": thread_id,
+                           "args": {"name": thread_name}} for thread_id, thread_name in self.thread_names.items())
+            trace = {
+                "traceEvents": events,
+                "stackFrames": stack_frames,
+                "samples": samples,
+                "displayTimeUnit": "ms"
+            }
+        temporary_file = f"{self.trace_file}.tmp"
+        try:
+            with open(temporary_file, 'w') as file:
+                json.dump(trace, file)
+            os.replace(temporary_file, self.trace_file)
+            logging.debug(f"Trace exported to {self.trace_file}.")
+        except OSError as e:
+            logging.error(f"An error occurred while exporting the trace to {self.trace_file}: {str(e)}")
+
+    def stop(self):
+        """
+        Stop the sampling profiler and the periodic export, then export the collected trace one last time.
+        """
+
+        self.stop_flusher()
+        self.stop_sampler()
+        self.export()
+
+
+tracer = Tracer()
+
+
+def setup_tracing(trace_enabled, trace_file, sampling_enabled, sampling_interval, flush_interval,
+                  max_events) -> None:
+    """
+    Configure the module-level tracer based on the provided parameters.
+
+    Span tracing and the sampling profiler are opt-in and independent of each other: either one can run on its own
+    and both write to the same trace file. Only the most recent max_events spans and samples are kept in memory, and
+    the trace file is rewritten every flush_interval seconds. The caller exports the final trace with tracer.stop().
+
+    Args:
+        trace_enabled (bool): Whether spans are recorded.
+        trace_file (str): The file to write the Chrome trace JSON to.
+        sampling_enabled (bool): Whether the sampling profiler runs.
+        sampling_interval (float): Seconds between two stack samples.
+        flush_interval (float): Seconds between two exports of the trace file.
+        max_events (int): How many spans, and separately how many samples, are kept in memory.
+
+    Returns:
+        None
+    """
+    tracer.enabled = trace_enabled
+    tracer.trace_file = trace_file
+    tracer.sampling_interval = sampling_interval
+    tracer.flush_interval = flush_interval
+    tracer.set_max_events(max_events)
+    if sampling_enabled:
+        tracer.start_sampling()
+    if trace_enabled or sampling_enabled:
+        tracer.start_flushing()